@@ -20,6 +20,22 @@ GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 def safe_filename(company, year):
     return f"{company.replace(' ', '_')}_{year}.json"
 
+# Expand one page_metrics category back to metric dicts. Schema 0.7 stores
+# columns ({"value": [...], "unit": [...]}); older files store the dicts.
+def page_metric_rows(page, key):
+    metrics = page.get(key) or []
+    if isinstance(metrics, list):
+        return metrics
+    return [dict(zip(metrics, row), page=page.get("page")) for row in zip(*metrics.values())]
+
+# Streamed reports keep page_metrics in an NDJSON sidecar; load it in place.
+def load_page_metrics(data):
+    path = data.pop("page_metrics_path", None)
+    if path and "page_metrics" not in data:
+        with open(path) as f:
+            data["page_metrics"] = [json.loads(line) for line in f if line.strip()]
+    return data
+
 #Remove duplicate metric entries by value & page.
 def deduplicate_metrics(metrics):
     dedup = {}
@@ -131,9 +147,9 @@ def aggregate_claim_metrics(claim, page_metrics):
     
     for page in page_metrics:
         if page.get("page") == claim_page:
-            relevant_metrics["scope1_emissions_tco2e"] = page.get("scope1_emissions_tco2e", [])
-            relevant_metrics["scope2_emissions_tco2e"] = page.get("scope2_emissions_tco2e", [])
-            relevant_metrics["generic_metrics"] = page.get("generic_metrics", [])
+            relevant_metrics["scope1_emissions_tco2e"] = page_metric_rows(page, "scope1_emissions_tco2e")
+            relevant_metrics["scope2_emissions_tco2e"] = page_metric_rows(page, "scope2_emissions_tco2e")
+            relevant_metrics["generic_metrics"] = page_metric_rows(page, "generic_metrics")
             break
     
     return relevant_metrics
@@ -341,13 +357,13 @@ def audit_document(data: dict) -> dict:
 
     for page in data.get("page_metrics", []):
         combined_metrics["scope1_emissions_tco2e"].extend(
-            page.get("scope1_emissions_tco2e", [])
+            page_metric_rows(page, "scope1_emissions_tco2e")
         )
         combined_metrics["scope2_emissions_tco2e"].extend(
-            page.get("scope2_emissions_tco2e", [])
+            page_metric_rows(page, "scope2_emissions_tco2e")
         )
         combined_metrics["generic_metrics"].extend(
-            page.get("generic_metrics", [])
+            page_metric_rows(page, "generic_metrics")
         )
 
     combined_metrics = deduplicate_metrics(combined_metrics)
@@ -391,7 +407,7 @@ def main():
             continue
 
         with open(os.path.join(INPUT_DIR, json_file)) as f:
-            data = json.load(f)
+            data = load_page_metrics(json.load(f))
 
         result = audit_document(data)
 
@@ -1,7 +1,7 @@
 import sys
 import os
-import json
 import time
+import orjson
 
 sys.path.append('/app')
 
@@ -11,6 +11,8 @@ from shared.database import get_supabase_client
 from auditor import (
     call_gemini_ai, 
     deduplicate_metrics, 
+    load_page_metrics,
+    page_metric_rows,
     safe_filename,
     sample_generic_metrics
 )
@@ -157,11 +159,12 @@ def process_task(task):
     
     try:
         # Load intermediate JSON
-        with open(intermediate_path, 'r') as f:
-            data = json.load(f)
+        with open(intermediate_path, 'rb') as f:
+            data = load_page_metrics(orjson.loads(f.read()))
         
         print(f"\n Loaded intermediate data:")
-        print(f"   Pages processed: {len(data.get('page_metrics', []))}")
+        print(f"   Pages processed: {data.get('stats', {}).get('total_pages', 'N/A')}")
+        print(f"   Pages with metrics: {len(data.get('page_metrics', []))}")
         print(f"   Total claims extracted: {len(data.get('claims', []))}")
         
         # Combine page-level metrics
@@ -174,16 +177,16 @@ def process_task(task):
         
         for page in data.get("page_metrics", []):
             combined_metrics["scope1_emissions_tco2e"].extend(
-                page.get("scope1_emissions_tco2e", [])
+                page_metric_rows(page, "scope1_emissions_tco2e")
             )
             combined_metrics["scope2_emissions_tco2e"].extend(
-                page.get("scope2_emissions_tco2e", [])
+                page_metric_rows(page, "scope2_emissions_tco2e")
             )
             combined_metrics["scope3_emissions_tco2e"].extend(
-                page.get("scope3_emissions_tco2e", [])
+                page_metric_rows(page, "scope3_emissions_tco2e")
             )
             combined_metrics["generic_metrics"].extend(
-                page.get("generic_metrics", [])
+                page_metric_rows(page, "generic_metrics")
             )
         
         # Deduplicate metrics
@@ -283,8 +286,8 @@ def process_task(task):
         output_filename = safe_filename(company, year)
         output_path = os.path.join(output_dir, output_filename)
         
-        with open(output_path, 'w') as f:
-            json.dump(output, f, indent=2)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
         
         print(f"\n Saved to: {output_path}")
         
@@ -1,4 +1,4 @@
-import pdfplumber
+import pymupdf
 import os
 import json
 import re
@@ -73,10 +73,10 @@ def extract_chunks_from_pdf(pdf_path: str) -> List[Dict]:
         year = 0
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
+        with pymupdf.open(pdf_path) as pdf:
+            for page_num, page in enumerate(pdf, 1):
                 try:
-                    text = page.extract_text() or ""
+                    text = page.get_text("text")
                     if not text.strip():
                         continue
                     
@@ -210,18 +210,19 @@ def chunk_document(report_data: dict) -> list:
             page_num = page_data.get('page', 0)
             
             # Create chunk from emissions data
-            scope1 = page_data.get('scope1_emissions_tco2e', [])
-            scope2 = page_data.get('scope2_emissions_tco2e', [])
+            # page_metrics categories are columnar ({"value": [...], ...})
+            scope1 = page_data.get('scope1_emissions_tco2e', {}).get('value', [])
+            scope2 = page_data.get('scope2_emissions_tco2e', {}).get('value', [])
             
             if scope1 or scope2:
                 emissions_text = f"Company: {company} ({year}). "
                 
                 if scope1:
-                    total_s1 = sum(m.get('value', 0) for m in scope1)
+                    total_s1 = sum(scope1)
                     emissions_text += f"Scope 1 emissions: {total_s1:.2f} tCO2e. "
                 
                 if scope2:
-                    total_s2 = sum(m.get('value', 0) for m in scope2)
+                    total_s2 = sum(scope2)
                     emissions_text += f"Scope 2 emissions: {total_s2:.2f} tCO2e. "
                 
                 chunks.append({
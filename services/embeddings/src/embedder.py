@@ -141,16 +141,17 @@ def store_report_metadata(processed_json_dir: str = "/data/processed_json"):
             ai_summary = report_data.get('ai_summary', {})
             
             # Calculate total emissions
+            # page_metrics categories are columnar ({"value": [...], ...})
             scope1_total = sum(
-                m.get('value', 0) 
+                value
                 for page in report_data.get('page_metrics', [])
-                for m in page.get('scope1_emissions_tco2e', [])
+                for value in page.get('scope1_emissions_tco2e', {}).get('value', [])
             )
             
             scope2_total = sum(
-                m.get('value', 0)
+                value
                 for page in report_data.get('page_metrics', [])
-                for m in page.get('scope2_emissions_tco2e', [])
+                for value in page.get('scope2_emissions_tco2e', {}).get('value', [])
             )
             
             data = {
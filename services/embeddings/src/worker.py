@@ -1,6 +1,6 @@
 import sys
 import os
-import json
+import orjson
 import time
 
 sys.path.append('/app')
@@ -20,8 +20,8 @@ def process_task(task):
     
     try:
         # Load audited JSON
-        with open(audit_path, 'r') as f:
-            data = json.load(f)
+        with open(audit_path, 'rb') as f:
+            data = orjson.loads(f.read())
         
         print(f" Loaded data:")
         print(f"   Company: {data.get('company', 'N/A')}")
@@ -53,7 +53,7 @@ def process_task(task):
         print(f"   Error: {e}")
         return False
     
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"\n Invalid JSON in {audit_path}")
         print(f"   Error: {e}")
         return False
@@ -1,13 +1,55 @@
-import pdfplumber
+import pymupdf
+import ahocorasick
 import os
-import json
+import orjson
 import re
+import bisect
+import logging
+import multiprocessing
 from datetime import datetime
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+
+try:
+    # Optional: linear-time matching for the scope patterns with a lazy ".*?",
+    # which otherwise rescan the rest of the page for every "Scope N" mention
+    import re2
+except ImportError:
+    re2 = None
+
+logger = logging.getLogger(__name__)
 
 INPUT_DIR = "/data/raw_pdfs"
 OUTPUT_DIR = "/data/intermediate_json"
 
+# Intermediate JSON is read by other services, so indent only when debugging
+JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 if os.getenv("PRETTY_JSON") == "1" else 0
+
+# Page ranges are parsed in parallel for documents at least this long; shorter
+# ones are not worth a process pool. Opt-in (like WORKER_CONCURRENCY), as
+# cpu_count ignores container CPU limits
+PAGE_WORKERS = int(os.getenv("PAGE_WORKERS", "1"))
+MIN_PARALLEL_PAGES = 8
+_PAGE_POOL_CONTEXT = multiprocessing.get_context("forkserver")
+
+# Per-page counters, summed across page ranges
+PAGE_STAT_KEYS = (
+    "text_extraction_failures",
+    "table_extraction_failures",
+    "claims_found",
+    "claims_with_context",
+    "claims_with_evidence",
+    "scope1_found",
+    "scope2_found",
+    "scope3_found",
+)
+
+# 0.7: page_metrics categories are stored as columns, one list per field
+SCHEMA_VERSION = "0.7"
+SCOPE_METRIC_FIELDS = ("value", "unit", "source")
+GENERIC_METRIC_FIELDS = ("value", "unit")
+
 # COMPREHENSIVE ESG KEYWORD TAXONOMY
 # === CORE EMISSIONS KEYWORDS ===
 EMISSIONS_KEYWORDS = [
@@ -252,13 +294,181 @@ SCOPE_PATTERNS = {
     ]
 }
 
+# Python's \s (str.isspace: includes NBSP and other Unicode spaces, all below
+# U+3001) spelled out for RE2, whose \s is ASCII-only
+_PY_SPACE_CLASS = "".join(f"\\x{{{c:x}}}" for c in range(0x3001) if chr(c).isspace())
+
+def _compile_scope_pattern(pattern):
+    """
+    Compile a case-insensitive scope pattern. Patterns with ".*" go to RE2 when
+    it is installed, with \s and \d translated to their Unicode meaning in
+    Python's re so both engines find the same matches. Everything else stays
+    on re, which is faster for short literal-led patterns as RE2 re-encodes
+    the page text on every call.
+    """
+    if re2 is None or ".*" not in pattern:
+        return re.compile(pattern, re.I)
+    out = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            escape = pattern[i + 1]
+            if escape == "s":
+                out.append(_PY_SPACE_CLASS if in_class else f"[{_PY_SPACE_CLASS}]")
+            elif escape == "d":
+                out.append(r"\p{Nd}")
+            elif escape in "wWbBSD":
+                # ASCII-only in RE2 as well; not worth translating
+                return re.compile(pattern, re.I)
+            else:
+                out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        out.append(ch)
+        i += 1
+    try:
+        return re2.compile("(?i)" + "".join(out))
+    except re2.error:
+        return re.compile(pattern, re.I)
+
+# Compile once at import; the page loop runs every pattern on every page
+_SCOPE_PATTERN_SOURCES = SCOPE_PATTERNS
+SCOPE_PATTERNS = {
+    category: [_compile_scope_pattern(pattern) for pattern in patterns]
+    for category, patterns in _SCOPE_PATTERN_SOURCES.items()
+}
+
+def _required_word(pattern):
+    """
+    Longest literal word (3+ letters) that every match of pattern must contain.
+    Only words outside groups and character classes count, as anything inside
+    a group may be optional or one of several alternatives.
+    """
+    best = ""
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            # Skip the class, including a leading "^" or "]"
+            i += 2 if pattern[i + 1] == "^" else 1
+            i += 1 if pattern[i] == "]" else 0
+            while pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return None
+        elif ch.isalpha() and depth == 0:
+            end = i
+            while end < len(pattern) and pattern[end].isalpha():
+                end += 1
+            word = pattern[i:end]
+            # A quantified last letter ("tonnes?") is optional
+            if pattern[end:end + 1] in ("?", "*", "{"):
+                word = word[:-1]
+            if len(word) > len(best):
+                best = word
+            i = end
+            continue
+        i += 1
+    return best.lower() if len(best) >= 3 else None
+
+# Lowercased anchor word for each scope pattern, found for all patterns in a
+# single automaton pass so patterns whose anchor is absent are never run.
+# The longest required word is the rarest in practice, so it gates best.
+# A pattern without a usable anchor (None) simply runs on every page.
+SCOPE_PATTERN_ANCHORS = {
+    category: [_required_word(pattern) for pattern in patterns]
+    for category, patterns in _SCOPE_PATTERN_SOURCES.items()
+}
+_SCOPE_ANCHORS = {a for anchors in SCOPE_PATTERN_ANCHORS.values() for a in anchors if a}
+
+# Table extraction only yields values for header cells or row labels that
+# contain one of these, so pages without them skip table detection
+TABLE_SCOPE_MARKERS = ("scope", "direct emission", "indirect", "value chain", "supply chain")
+
+# Single-pass matcher for everything a page is screened for. Each term maps to
+# (claim keyword or None, scope anchor or None, is table marker).
+_CLAIM_BY_LOWER = {kw.lower(): kw for kw in CLAIM_KEYWORDS}
+_PAGE_TERMS_AC = ahocorasick.Automaton()
+for _term in _SCOPE_ANCHORS | set(TABLE_SCOPE_MARKERS) | set(_CLAIM_BY_LOWER):
+    _PAGE_TERMS_AC.add_word(_term, (
+        _CLAIM_BY_LOWER.get(_term),
+        _term if _term in _SCOPE_ANCHORS else None,
+        _term in TABLE_SCOPE_MARKERS,
+    ))
+_PAGE_TERMS_AC.make_automaton()
+
 # Improved numeric regex patterns
-NUMERIC_PATTERN = r"([\d]{1,3}(?:[,\s]?\d{3})*(?:\.\d+)?)\s*(tCO2e|tCO2|tonnes\s+CO2e?|t\s+CO2e?|kg|tonnes?|%|percent|MWh|kWh|GWh|TJ|L|liters?|m3|m³|ML)?"
+_METRIC_UNITS = r"tCO2e|tCO2|tonnes\s+CO2e?|t\s+CO2e?|kg|tonnes?|%|percent|MWh|kWh|GWh|TJ|L|liters?|m3|m³|ML"
+# Any number, unit optional; only counted inside claim contexts
+NUMERIC_RE = re.compile(r"([\d]{1,3}(?:[,\s]?\d{3})*(?:\.\d+)?)\s*(" + _METRIC_UNITS + r")?", re.I)
+# Whole-page scan for generic metrics: the number must start a token and carry
+# a unit, so page numbers, dates and footnote markers never match. Suffixed
+# spellings (tCO2eq, tonnesCO2e, kgCO2e) are listed explicitly; only the short
+# units that also start ordinary words ("Long", "Tonnage", "MLs") must end there
+_GENERIC_METRIC_UNITS = (
+    r"tCO2e(?:q|-eq)?|tCO2|tonnes?\s*CO2e?|t\s+CO2e?|kgCO2e?|kg|%|percent|MWh|kWh|GWh"
+    r"|liters?|m3|m³|(?:tonnes?|TJ|ML|L)(?![a-z])"
+)
+UNIT_METRIC_RE = re.compile(
+    r"(?<![\w.,])(\d{1,3}(?:[,\s]?\d{3})*(?:\.\d+)?)\s*(" + _GENERIC_METRIC_UNITS + r")", re.I
+)
+
+# Target-year patterns, tried in order against lowercased text. Page text has
+# its newlines replaced, so DOTALL only lets ".*?" skip the newline check.
+_YEAR_RES = tuple(re.compile(pattern, re.DOTALL) for pattern in (
+    r"by\s+(20\d{2})",
+    r"target\s+year[:\s]+(20\d{2})",
+    r"achieve.*?(20\d{2})",
+    r"reach.*?(20\d{2})",
+    r"goal.*?(20\d{2})",
+    r"commitment.*?(20\d{2})",
+    r"pledge.*?(20\d{2})",
+))
+
+# Table header rows, scope header cells and scope row labels (case-insensitive).
+# Kept as separate patterns because one label can name several scopes.
+_TABLE_HEADER_RE = re.compile(r"scope|emissions|ghg|category|type", re.I)
+_HEADER_SCOPE1_RE = re.compile(r"scope ?1", re.I)
+_HEADER_SCOPE2_RE = re.compile(r"scope ?2", re.I)
+_HEADER_SCOPE3_RE = re.compile(r"scope ?3", re.I)
+_LABEL_SCOPE1_RE = re.compile(r"scope ?1|direct emission", re.I)
+_LABEL_SCOPE2_RE = re.compile(r"scope ?2|indirect", re.I)
+_LABEL_SCOPE3_RE = re.compile(r"scope ?3|value chain|supply chain", re.I)
+
+COMMITMENT_WORDS = (
+    "committed", "pledge", "target", "goal", "aim",
+    "plan", "strategy", "initiative", "invest", "reduce"
+)
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_PUNCT_SPLIT_RE = re.compile(r"[.!?]")
+_DIGIT_RE = re.compile(r"\d")
 
 # HELPER FUNCTIONS
 def safe_filename(company, year):
     return f"{company.replace(' ', '_')}_{year}.json"
 
+def to_columns(metrics, fields):
+    """Lay out metric dicts as one list per field (the page lives on the page record)."""
+    return {field: [m[field] for m in metrics] for field in fields}
+
+# Captured strings repeat heavily (years, table cells, restated totals), so a
+# cache hit is cheaper than re-cleaning and re-parsing
+@lru_cache(maxsize=4096)
 def parse_number(val):
     """Parse number, handling commas and various formats."""
     if not val:
@@ -269,6 +479,7 @@ def parse_number(val):
     except (ValueError, AttributeError):
         return None
 
+@lru_cache(maxsize=256)
 def normalize_unit(unit):
     """Normalize unit strings to standard format."""
     if not unit:
@@ -279,7 +490,7 @@ def normalize_unit(unit):
     # Normalize CO2 units
     if any(x in unit for x in ["tco2e", "tonnes co2e", "t co2e"]):
         return "tCO2e"
-    if "tco2" in unit or "t co2" in unit:
+    if "tco2" in unit or "t co2" in unit or "tonnesco2" in unit or "tonneco2" in unit:
         return "tCO2e"
     
     # Normalize energy units
@@ -299,7 +510,7 @@ def normalize_unit(unit):
     # Normalize weight
     if "tonne" in unit or unit == "t":
         return "tonnes"
-    if unit == "kg":
+    if unit == "kg" or unit.startswith("kgco2"):
         return "kg"
     
     # Normalize volume
@@ -310,70 +521,85 @@ def normalize_unit(unit):
     
     return unit
 
-def extract_target_year(text):
+# Normalized allowed units per claim, resolved once instead of per filter call
+_ALLOWED_NORMALIZED = {
+    claim: frozenset(normalize_unit(u) for u in units)
+    for claim, units in CLAIM_UNITS.items()
+}
+
+def extract_target_year(text, text_lower=None):
     """Extract target year from text with improved patterns."""
-    patterns = [
-        r"by\s+(20\d{2})",
-        r"target\s+year[:\s]+(20\d{2})",
-        r"achieve.*?(20\d{2})",
-        r"reach.*?(20\d{2})",
-        r"goal.*?(20\d{2})",
-        r"commitment.*?(20\d{2})",
-        r"pledge.*?(20\d{2})",
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text.lower())
+    if text_lower is None:
+        text_lower = text.lower()
+    # Every pattern needs a literal "20" (the year), so most contexts (no year at
+    # all) are settled by one substring test instead of seven failed searches
+    if "20" not in text_lower:
+        return None
+    for pattern in _YEAR_RES:
+        match = pattern.search(text_lower)
         if match:
             year = int(match.group(1))
             if 2020 <= year <= 2100:
                 return year
     return None
 
-def extract_sentence_context(text, claim_keyword, num_sentences=3):
+def split_sentences(text):
+    """Split text into sentences and the offset at which each one starts."""
+    sentences = _SENTENCE_SPLIT_RE.split(text)
+    starts = [0]
+    for sentence in sentences[:-1]:
+        starts.append(starts[-1] + len(sentence) + 1)
+    return sentences, starts
+
+def extract_sentence_context(text, claim_keyword, num_sentences=3, *, text_lower=None, claim_pos=None,
+                             sentences=None, starts=None):
     """
     Extract full sentences around the claim for better context.
     Returns up to num_sentences before and after the claim.
+    Expects newline-free page text; pass text_lower to reuse the page's lowered
+    copy, claim_pos when the keyword offset is already known, and the page's
+    split_sentences() result to avoid re-splitting per claim.
     """
-    claim_pos = text.lower().find(claim_keyword.lower())
+    if claim_pos is None:
+        if text_lower is None:
+            text_lower = text.lower()
+        claim_pos = text_lower.find(claim_keyword.lower())
     if claim_pos == -1:
         return ""
     
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    if sentences is None or starts is None:
+        sentences, starts = split_sentences(text)
     
-    current_pos = 0
-    claim_sentence_idx = -1
-    
-    for idx, sentence in enumerate(sentences):
-        sentence_end = current_pos + len(sentence)
-        if current_pos <= claim_pos < sentence_end:
-            claim_sentence_idx = idx
-            break
-        current_pos = sentence_end + 1
+    claim_sentence_idx = bisect.bisect_right(starts, claim_pos) - 1
+    if claim_pos >= starts[claim_sentence_idx] + len(sentences[claim_sentence_idx]):
+        claim_sentence_idx = -1
     
     if claim_sentence_idx == -1:
-        return extract_claim_context(text, claim_keyword, window=300)
+        return extract_claim_context(text, claim_keyword, window=300, claim_pos=claim_pos)
     
     start_idx = max(0, claim_sentence_idx - num_sentences)
     end_idx = min(len(sentences), claim_sentence_idx + num_sentences + 1)
     
     context_sentences = sentences[start_idx:end_idx]
-    context = " ".join(context_sentences).replace("\n", " ").strip()
+    context = " ".join(context_sentences).strip()
     
     if len(context) > 500:
         context = context[:500] + "..."
     
     return context
 
-def extract_claim_context(text, claim_keyword, window=300):
+def extract_claim_context(text, claim_keyword, window=300, *, text_lower=None, claim_pos=None):
     """Extract surrounding text context for a claim (character-based fallback)."""
-    claim_pos = text.lower().find(claim_keyword.lower())
+    if claim_pos is None:
+        if text_lower is None:
+            text_lower = text.lower()
+        claim_pos = text_lower.find(claim_keyword.lower())
     if claim_pos == -1:
         return ""
     
     start = max(0, claim_pos - window)
     end = min(len(text), claim_pos + len(claim_keyword) + window)
-    context = text[start:end].replace("\n", " ").strip()
+    context = text[start:end].strip()
     
     return context
 
@@ -386,102 +612,77 @@ def extract_supporting_evidence(context, claim_keyword):
         "key_phrases": []
     }
     
-    target_year = extract_target_year(context)
+    context_lower = context.lower()
+    
+    target_year = extract_target_year(context, context_lower)
     if target_year:
         evidence["has_target_year"] = True
         evidence["target_year"] = target_year
     
-    numeric_matches = re.findall(NUMERIC_PATTERN, context, re.I)
+    numeric_matches = NUMERIC_RE.findall(context)
     if numeric_matches:
         evidence["has_numeric_data"] = True
         evidence["numeric_count"] = len(numeric_matches)
     
-    commitment_words = [
-        "committed", "pledge", "target", "goal", "aim", 
-        "plan", "strategy", "initiative", "invest", "reduce"
-    ]
-    
-    found_commitments = [word for word in commitment_words if word in context.lower()]
+    found_commitments = [word for word in COMMITMENT_WORDS if word in context_lower]
     if found_commitments:
         evidence["has_commitment_language"] = True
         evidence["commitment_words"] = found_commitments[:3]
     
-    sentences = re.split(r'[.!?]', context)
-    for sentence in sentences:
+    # Splitting the lowered copy too yields the same pieces, already lowercased
+    sentences = zip(_PUNCT_SPLIT_RE.split(context), _PUNCT_SPLIT_RE.split(context_lower))
+    for sentence, sentence_lower in sentences:
         sentence = sentence.strip()
-        if not sentence:
+        if len(sentence) <= 20:
             continue
         
-        if re.search(r'\d', sentence) or any(word in sentence.lower() for word in commitment_words[:5]):
-            if len(sentence) > 20:
-                evidence["key_phrases"].append(sentence[:150])
-                if len(evidence["key_phrases"]) >= 3:
-                    break
+        sentence_lower = sentence_lower.strip()
+        if _DIGIT_RE.search(sentence) or any(word in sentence_lower for word in COMMITMENT_WORDS[:5]):
+            evidence["key_phrases"].append(sentence[:150])
+            if len(evidence["key_phrases"]) >= 3:
+                break
     
     return evidence
 
 # SCOPE EXTRACTION FUNCTIONS
-def extract_scope_from_text(text, page_num):
-    """Extract Scope 1, 2, and 3 emissions with comprehensive patterns."""
-    clean = text.replace("\n", " ")
-    scope1, scope2, scope3, total = [], [], [], []
-    
-    # Extract Scope 1
-    for pattern in SCOPE_PATTERNS["scope1"]:
-        matches = re.findall(pattern, clean, re.I)
-        for match in matches:
-            value_str = match[0] if isinstance(match, tuple) else match
-            val = parse_number(value_str)
-            if val is not None and val > 0:
-                scope1.append({
-                    "value": val,
-                    "page": page_num,
-                    "unit": "tCO2e",
-                    "source": "text_extraction"
-                })
-    
-    # Extract Scope 2
-    for pattern in SCOPE_PATTERNS["scope2"]:
-        matches = re.findall(pattern, clean, re.I)
-        for match in matches:
-            value_str = match[0] if isinstance(match, tuple) else match
-            val = parse_number(value_str)
-            if val is not None and val > 0:
-                scope2.append({
-                    "value": val,
-                    "page": page_num,
-                    "unit": "tCO2e",
-                    "source": "text_extraction"
-                })
-    
-    # Extract Scope 3 (NEW!)
-    for pattern in SCOPE_PATTERNS["scope3"]:
-        matches = re.findall(pattern, clean, re.I)
-        for match in matches:
-            value_str = match[0] if isinstance(match, tuple) else match
-            val = parse_number(value_str)
-            if val is not None and val > 0:
-                scope3.append({
-                    "value": val,
-                    "page": page_num,
-                    "unit": "tCO2e",
-                    "source": "text_extraction"
-                })
+def extract_scope_from_text(text, page_num, text_lower=None, *, present=None):
+    """
+    Extract Scope 1, 2, and 3 emissions from newline-free page text.
+    present is the set of scope anchors found on the page, if already known.
+    """
+    if present is None:
+        if text_lower is None:
+            text_lower = text.lower()
+        present = {anchor for _, (_, anchor, _) in _PAGE_TERMS_AC.iter(text_lower) if anchor}
+    results = []
     
-    # Extract Total
-    for pattern in SCOPE_PATTERNS["total"]:
-        matches = re.findall(pattern, clean, re.I)
-        for match in matches:
-            value_str = match[0] if isinstance(match, tuple) else match
-            val = parse_number(value_str)
-            if val is not None and val > 0:
-                total.append({
+    for category in ("scope1", "scope2", "scope3", "total"):
+        seen = set()
+        seen_raw = set()
+        metrics = []
+        for pattern, anchor in zip(SCOPE_PATTERNS[category], SCOPE_PATTERN_ANCHORS[category]):
+            if anchor is not None and anchor not in present:
+                continue
+            for match in pattern.finditer(text):
+                # Overlapping patterns often capture the same number; skip
+                # re-parsing a capture already handled in this category
+                raw = match.group(1)
+                if raw in seen_raw:
+                    continue
+                seen_raw.add(raw)
+                val = parse_number(raw)
+                if val is None or val <= 0 or val in seen:
+                    continue
+                seen.add(val)
+                metrics.append({
                     "value": val,
                     "page": page_num,
                     "unit": "tCO2e",
                     "source": "text_extraction"
                 })
+        results.append(metrics)
     
+    scope1, scope2, scope3, total = results
     return scope1, scope2, scope3, total
 
 def extract_scope_from_tables(page, page_num):
@@ -490,8 +691,15 @@ def extract_scope_from_tables(page, page_num):
     """
     scope1, scope2, scope3, total = [], [], [], []
     
+    # find_tables builds its own character list and, with the "lines" strategy
+    # requested below, derives cells only from the page's vector drawings;
+    # without any there is nothing to build cells from, so skip that pass
+    if not page.get_cdrawings():
+        return scope1, scope2, scope3, total
+    
     try:
-        tables = page.extract_tables()
+        # Ruled tables only; text-alignment strategies cluster every word on the page
+        tables = [table.extract() for table in page.find_tables(strategy="lines").tables]
         if not tables:
             return scope1, scope2, scope3, total
         
@@ -499,14 +707,20 @@ def extract_scope_from_tables(page, page_num):
             if not table or len(table) < 2:
                 continue
             
+            # Every header and label rule below needs one of the scope markers
+            # in some cell, so tables without any are skipped in one pass
+            table_text = " ".join(str(cell) for row in table if row for cell in row if cell).lower()
+            if not any(marker in table_text for marker in TABLE_SCOPE_MARKERS):
+                continue
+            
             # Strategy 1: Find header row
             header_row_idx = -1
             for idx, row in enumerate(table):
                 if not row:
                     continue
-                row_text = " ".join(str(cell or "") for cell in row).lower()
+                row_text = " ".join(str(cell or "") for cell in row)
                 
-                if any(h in row_text for h in ["scope", "emissions", "ghg", "category", "type"]):
+                if _TABLE_HEADER_RE.search(row_text):
                     header_row_idx = idx
                     break
             
@@ -518,13 +732,13 @@ def extract_scope_from_tables(page, page_num):
                 for col_idx, cell in enumerate(header):
                     if not cell:
                         continue
-                    cell_text = str(cell).lower()
+                    cell_text = str(cell)
                     
-                    if "scope 1" in cell_text or "scope1" in cell_text:
+                    if _HEADER_SCOPE1_RE.search(cell_text):
                         scope1_cols.append(col_idx)
-                    if "scope 2" in cell_text or "scope2" in cell_text:
+                    if _HEADER_SCOPE2_RE.search(cell_text):
                         scope2_cols.append(col_idx)
-                    if "scope 3" in cell_text or "scope3" in cell_text:
+                    if _HEADER_SCOPE3_RE.search(cell_text):
                         scope3_cols.append(col_idx)
             
             # Strategy 3: Process data rows
@@ -534,7 +748,7 @@ def extract_scope_from_tables(page, page_num):
                     continue
                 
                 # Check row label
-                row_label = str(row[0] or "").lower() if row else ""
+                row_label = str(row[0] or "") if row else ""
                 
                 # Extract from identified columns
                 for col_idx in scope1_cols:
@@ -571,7 +785,7 @@ def extract_scope_from_tables(page, page_num):
                             })
                 
                 # Strategy 4: Check row labels for scope keywords
-                if any(kw in row_label for kw in ["scope 1", "scope1", "direct emission"]):
+                if _LABEL_SCOPE1_RE.search(row_label):
                     for cell in row[1:]:
                         if cell:
                             val = parse_number(str(cell))
@@ -583,7 +797,7 @@ def extract_scope_from_tables(page, page_num):
                                     "source": f"table_{table_idx}_label"
                                 })
                 
-                if any(kw in row_label for kw in ["scope 2", "scope2", "indirect", "energy indirect"]):
+                if _LABEL_SCOPE2_RE.search(row_label):
                     for cell in row[1:]:
                         if cell:
                             val = parse_number(str(cell))
@@ -595,7 +809,7 @@ def extract_scope_from_tables(page, page_num):
                                     "source": f"table_{table_idx}_label"
                                 })
                 
-                if any(kw in row_label for kw in ["scope 3", "scope3", "value chain", "supply chain"]):
+                if _LABEL_SCOPE3_RE.search(row_label):
                     for cell in row[1:]:
                         if cell:
                             val = parse_number(str(cell))
@@ -608,31 +822,40 @@ def extract_scope_from_tables(page, page_num):
                                 })
     
     except Exception as e:
-        print(f"  Table extraction warning on page {page_num}: {type(e).__name__}", flush=True)
+        logger.warning("Table extraction warning on page %d: %s", page_num, type(e).__name__)
     
     return scope1, scope2, scope3, total
 
 def extract_generic_metrics(text, page_num):
-    """Extract all numeric patterns with improved unit detection."""
-    matches = re.findall(NUMERIC_PATTERN, text, re.I)
+    """Extract unique numeric patterns on a page with improved unit detection."""
+    seen = set()
+    seen_raw = set()
     metrics = []
     
-    for val, unit in matches:
-        num = parse_number(val)
-        if num is not None and num > 0:
-            normalized_unit = normalize_unit(unit)
-            metrics.append({
-                "value": num,
-                "unit": normalized_unit,
-                "page": page_num
-            })
+    for match in UNIT_METRIC_RE.finditer(text):
+        raw = match.group(1, 2)
+        if raw in seen_raw:
+            continue
+        seen_raw.add(raw)
+        num = parse_number(raw[0])
+        if num is None or num <= 0:
+            continue
+        normalized_unit = normalize_unit(raw[1])
+        key = (num, normalized_unit)
+        if key in seen:
+            continue
+        seen.add(key)
+        metrics.append({
+            "value": num,
+            "unit": normalized_unit,
+            "page": page_num
+        })
     
     return metrics
 
 def filter_metrics_by_claim(metrics, claim):
     """Filter extracted metrics based on claim-specific allowed units."""
-    allowed_units = CLAIM_UNITS.get(claim, [])
-    allowed_units_normalized = [normalize_unit(u) for u in allowed_units]
+    allowed_units_normalized = _ALLOWED_NORMALIZED.get(claim, frozenset())
     
     filtered = []
     for m in metrics:
@@ -644,147 +867,232 @@ def filter_metrics_by_claim(metrics, claim):
 
 def deduplicate_metrics_on_page(metrics):
     """Remove duplicate metrics on the same page."""
-    seen = set()
-    deduped = []
-    
+    # setdefault keeps the first metric per key, in first-seen order
+    deduped = {}
     for m in metrics:
-        key = (m.get("value"), m.get("unit"))
-        if key not in seen:
-            seen.add(key)
-            deduped.append(m)
-    
-    return deduped
+        deduped.setdefault((m.get("value"), m.get("unit")), m)
+    return list(deduped.values())
 
 
 # MAIN PROCESSING FUNCTION
-def process_pdf(file_path):
-    """Process PDF with comprehensive keyword extraction and improved error handling."""
+def _process_page(page, page_num, stats):
+    """
+    Extract metrics and claims from one page, counting into stats.
+    Returns (page_record, claims); page_record is None when the page has no metric.
+    """
+    # Extract text
+    text = ""
+    try:
+        text = page.get_text("text").replace("\n", " ")
+    except Exception as e:
+        stats["text_extraction_failures"] += 1
+        logger.warning("Page %d text extraction failed: %s", page_num, type(e).__name__)
+
+    # Image-only and blank pages (no text layer) cannot match anything;
+    # isspace() stops at the first visible character of a real page
+    if not text or text.isspace():
+        return None, []
+
+    text_lower = text.lower()
+
+    # Detect claims, scope anchors and table markers in one
+    # automaton pass, keeping the first offset of each keyword
+    claim_positions = {}
+    anchors = set()
+    has_table_marker = False
+    for end_idx, (kw, anchor, is_marker) in _PAGE_TERMS_AC.iter(text_lower):
+        if kw is not None and kw not in claim_positions:
+            claim_positions[kw] = end_idx - len(kw) + 1
+        if anchor is not None:
+            anchors.add(anchor)
+        if is_marker:
+            has_table_marker = True
+
+    # Extract emissions from text
+    s1_text, s2_text, s3_text, total_text = extract_scope_from_text(text, page_num, present=anchors)
+
+    # Extract emissions from tables, only when the page mentions a scope marker
+    s1_table, s2_table, s3_table, total_table = [], [], [], []
+    if has_table_marker:
+        try:
+            s1_table, s2_table, s3_table, total_table = extract_scope_from_tables(page, page_num)
+        except Exception as e:
+            stats["table_extraction_failures"] += 1
+
+    # Combine and deduplicate
+    scope1 = deduplicate_metrics_on_page(s1_text + s1_table)
+    scope2 = deduplicate_metrics_on_page(s2_text + s2_table)
+    scope3 = deduplicate_metrics_on_page(s3_text + s3_table)
+    total_emissions = deduplicate_metrics_on_page(total_text + total_table)
+
+    page_claims = [kw for kw in CLAIM_KEYWORDS if kw in claim_positions]
+
+    # Every page's generic metrics feed the auditor's combined metrics, not
+    # just the pages whose claims draw on them
+    generic_metrics = extract_generic_metrics(text, page_num)
+
+    # Update stats
+    stats["scope1_found"] += len(scope1)
+    stats["scope2_found"] += len(scope2)
+    stats["scope3_found"] += len(scope3)
+
+    page_record = {
+        "page": page_num,
+        "scope1_emissions_tco2e": to_columns(scope1, SCOPE_METRIC_FIELDS),
+        "scope2_emissions_tco2e": to_columns(scope2, SCOPE_METRIC_FIELDS),
+        "scope3_emissions_tco2e": to_columns(scope3, SCOPE_METRIC_FIELDS),
+        "total_emissions_tco2e": to_columns(total_emissions, SCOPE_METRIC_FIELDS)
+    }
+    if generic_metrics:
+        page_record["generic_metrics"] = to_columns(generic_metrics, GENERIC_METRIC_FIELDS)
+    # Narrative pages without any metric are left out of the output
+    if not (scope1 or scope2 or scope3 or total_emissions or generic_metrics):
+        page_record = None
+
+    # Claims sharing a sentence window share the same evidence
+    claims = []
+    evidence_by_context = {}
+    if page_claims:
+        sentences, starts = split_sentences(text)
+
+    for kw in page_claims:
+        claim_pos = claim_positions[kw]
+        context = extract_sentence_context(
+            text, kw, num_sentences=3, claim_pos=claim_pos,
+            sentences=sentences, starts=starts
+        )
+
+        if not context or len(context) < 50:
+            context = extract_claim_context(text, kw, window=300, claim_pos=claim_pos)
+
+        evidence = evidence_by_context.get(context)
+        if evidence is None:
+            evidence = extract_supporting_evidence(context, kw)
+            evidence_by_context[context] = evidence
+
+        # Determine metrics for this claim
+        if kw in EMISSIONS_CLAIMS:
+            claim_metrics = {
+                "scope1_emissions_tco2e": scope1,
+                "scope2_emissions_tco2e": scope2,
+                "scope3_emissions_tco2e": scope3,
+                "generic_metrics": []
+            }
+        else:
+            claim_metrics = {
+                "scope1_emissions_tco2e": [],
+                "scope2_emissions_tco2e": [],
+                "scope3_emissions_tco2e": [],
+                "generic_metrics": filter_metrics_by_claim(generic_metrics, kw)
+            }
+
+        claim_obj = {
+            "claim": kw,
+            "page": page_num,
+            "target_year": evidence.get("target_year"),
+            "context": context,
+            "evidence": evidence,
+            "metrics": claim_metrics
+        }
+
+        claims.append(claim_obj)
+        stats["claims_found"] += 1
+
+        if context and len(context) > 50:
+            stats["claims_with_context"] += 1
+        if evidence.get("has_numeric_data") or evidence.get("has_target_year"):
+            stats["claims_with_evidence"] += 1
+
+    return page_record, claims
+
+def _process_page_range(file_path, start, end):
+    """Process pages [start, end) of a PDF in a pool worker with its own document handle."""
+    stats = dict.fromkeys(PAGE_STAT_KEYS, 0)
+    page_metrics = []
+    claims = []
+    with pymupdf.open(file_path) as pdf:
+        for i in range(start, end):
+            page_record, page_claims = _process_page(pdf[i], i + 1, stats)
+            if page_record is not None:
+                page_metrics.append(page_record)
+            claims.extend(page_claims)
+    return page_metrics, claims, stats
+
+def process_pdf(file_path, *, pdf=None, page_metrics_path=None, page_workers=PAGE_WORKERS):
+    """
+    Process PDF with comprehensive keyword extraction and improved error handling.
+    Pass an already-open pymupdf document as pdf to reuse it; it is left open.
+    With page_metrics_path, page records are streamed there as NDJSON instead of
+    being kept in memory, and the result carries that path in place of page_metrics.
+    Documents of MIN_PARALLEL_PAGES or more opened from file_path are split into
+    contiguous page ranges processed by up to page_workers processes.
+    """
     page_metrics = []
     claims = []
     pdf_filename = os.path.basename(file_path)
     
     stats = {
         "total_pages": 0,
-        "text_extraction_failures": 0,
-        "table_extraction_failures": 0,
-        "claims_found": 0,
-        "claims_with_context": 0,
-        "claims_with_evidence": 0,
-        "scope1_found": 0,
-        "scope2_found": 0,
-        "scope3_found": 0,
+        **dict.fromkeys(PAGE_STAT_KEYS, 0),
         "keywords_loaded": len(CLAIM_KEYWORDS)
     }
 
-    print(f"  Processing with {stats['keywords_loaded']} ESG keywords...", flush=True)
+    logger.debug("Processing with %d ESG keywords", stats['keywords_loaded'])
 
     try:
-        with pdfplumber.open(file_path) as pdf:
-            stats["total_pages"] = len(pdf.pages)
-            
-            for i, page in enumerate(pdf.pages):
-                page_num = i + 1
-                
-                # Extract text
-                text = ""
-                try:
-                    text = page.extract_text() or ""
-                except Exception as e:
-                    stats["text_extraction_failures"] += 1
-                    print(f"  Warning: Page {page_num} text extraction failed: {type(e).__name__}", flush=True)
-
-                # Extract emissions from text
-                s1_text, s2_text, s3_text, total_text = extract_scope_from_text(text, page_num)
-                
-                # Extract emissions from tables
-                s1_table, s2_table, s3_table, total_table = [], [], [], []
-                try:
-                    s1_table, s2_table, s3_table, total_table = extract_scope_from_tables(page, page_num)
-                except Exception as e:
-                    stats["table_extraction_failures"] += 1
-                
-                # Combine and deduplicate
-                scope1 = deduplicate_metrics_on_page(s1_text + s1_table)
-                scope2 = deduplicate_metrics_on_page(s2_text + s2_table)
-                scope3 = deduplicate_metrics_on_page(s3_text + s3_table)
-                total_emissions = deduplicate_metrics_on_page(total_text + total_table)
-                
-                generic_metrics = extract_generic_metrics(text, page_num)
-                generic_metrics = deduplicate_metrics_on_page(generic_metrics)
+        with (
+            pymupdf.open(file_path) if pdf is None else nullcontext(pdf) as doc,
+            open(page_metrics_path, "wb") if page_metrics_path else nullcontext() as pages_out,
+        ):
+            stats["total_pages"] = doc.page_count
 
-                # Update stats
-                stats["scope1_found"] += len(scope1)
-                stats["scope2_found"] += len(scope2)
-                stats["scope3_found"] += len(scope3)
+            def emit(page_record):
+                if pages_out is None:
+                    page_metrics.append(page_record)
+                else:
+                    pages_out.write(orjson.dumps(page_record) + b"\n")
 
-                page_metrics.append({
-                    "page": page_num,
-                    "scope1_emissions_tco2e": scope1,
-                    "scope2_emissions_tco2e": scope2,
-                    "scope3_emissions_tco2e": scope3,
-                    "total_emissions_tco2e": total_emissions,
-                    "generic_metrics": generic_metrics
-                })
-
-                # Detect claims with comprehensive keyword list
-                for kw in CLAIM_KEYWORDS:
-                    if kw.lower() in text.lower():
-                        context = extract_sentence_context(text, kw, num_sentences=3)
-                        
-                        if not context or len(context) < 50:
-                            context = extract_claim_context(text, kw, window=300)
-                        
-                        evidence = extract_supporting_evidence(context, kw)
-                        
-                        # Determine metrics for this claim
-                        if kw in EMISSIONS_CLAIMS:
-                            claim_metrics = {
-                                "scope1_emissions_tco2e": scope1,
-                                "scope2_emissions_tco2e": scope2,
-                                "scope3_emissions_tco2e": scope3,
-                                "generic_metrics": []
-                            }
-                        else:
-                            claim_metrics = {
-                                "scope1_emissions_tco2e": [],
-                                "scope2_emissions_tco2e": [],
-                                "scope3_emissions_tco2e": [],
-                                "generic_metrics": filter_metrics_by_claim(generic_metrics, kw)
-                            }
-
-                        claim_obj = {
-                            "claim": kw,
-                            "page": page_num,
-                            "target_year": extract_target_year(context),
-                            "context": context,
-                            "evidence": evidence,
-                            "metrics": claim_metrics
-                        }
-                        
-                        claims.append(claim_obj)
-                        stats["claims_found"] += 1
-                        
-                        if context and len(context) > 50:
-                            stats["claims_with_context"] += 1
-                        if evidence.get("has_numeric_data") or evidence.get("has_target_year"):
-                            stats["claims_with_evidence"] += 1
+            workers = min(page_workers, doc.page_count)
+            if pdf is None and workers > 1 and doc.page_count >= MIN_PARALLEL_PAGES:
+                bounds = [doc.page_count * k // workers for k in range(workers + 1)]
+                # Children come from a fresh forkserver, never a fork of the
+                # caller, which may be running threads (the worker's prefetcher)
+                with ProcessPoolExecutor(max_workers=workers, mp_context=_PAGE_POOL_CONTEXT) as executor:
+                    futures = [
+                        executor.submit(_process_page_range, file_path, bounds[k], bounds[k + 1])
+                        for k in range(workers)
+                    ]
+                    # Ranges are contiguous, so collecting in submission order keeps page order
+                    for future in futures:
+                        range_metrics, range_claims, range_stats = future.result()
+                        for page_record in range_metrics:
+                            emit(page_record)
+                        claims.extend(range_claims)
+                        for key in PAGE_STAT_KEYS:
+                            stats[key] += range_stats[key]
+            else:
+                for i, page in enumerate(doc):
+                    page_record, page_claims = _process_page(page, i + 1, stats)
+                    if page_record is not None:
+                        emit(page_record)
+                    claims.extend(page_claims)
             
             # Log statistics
-            print(f"  Extraction complete:", flush=True)
-            print(f"    Pages: {stats['total_pages']}", flush=True)
-            print(f"    Claims found: {stats['claims_found']}", flush=True)
-            print(f"    Scope 1 metrics: {stats['scope1_found']}", flush=True)
-            print(f"    Scope 2 metrics: {stats['scope2_found']}", flush=True)
-            print(f"    Scope 3 metrics: {stats['scope3_found']}", flush=True)
-            
-            if stats["text_extraction_failures"] > 0:
-                print(f"    Text failures: {stats['text_extraction_failures']}", flush=True)
-            if stats["table_extraction_failures"] > 0:
-                print(f"    Table failures: {stats['table_extraction_failures']}", flush=True)
+            logger.debug(
+                "Extraction complete: %d pages, %d claims, scope 1/2/3 metrics %d/%d/%d",
+                stats['total_pages'], stats['claims_found'],
+                stats['scope1_found'], stats['scope2_found'], stats['scope3_found'],
+            )
+            if stats["text_extraction_failures"] or stats["table_extraction_failures"]:
+                logger.warning(
+                    "Extraction failures: %d text, %d table",
+                    stats['text_extraction_failures'], stats['table_extraction_failures'],
+                )
 
     except Exception as e:
-        print(f"  ERROR: Failed to process PDF: {type(e).__name__}: {e}", flush=True)
+        logger.error("Failed to process PDF: %s: %s", type(e).__name__, e)
         return {
+            "schema_version": SCHEMA_VERSION,
             "processed_at": datetime.utcnow().isoformat(),
             "page_metrics": [],
             "claims": [],
@@ -793,15 +1101,50 @@ def process_pdf(file_path):
         }
 
     return {
+        "schema_version": SCHEMA_VERSION,
         "processed_at": datetime.utcnow().isoformat(),
-        "page_metrics": page_metrics,
+        **({"page_metrics_path": page_metrics_path} if page_metrics_path else {"page_metrics": page_metrics}),
         "claims": claims,
         "stats": stats
     }
 
 # STANDALONE EXECUTION (for testing)
+def _process_one(pdf_file):
+    """Process and save one PDF from INPUT_DIR, returning its summary counts."""
+    name, year = pdf_file.replace(".pdf", "").rsplit("_", 1)
+    year = int(year)
+    input_path = os.path.join(INPUT_DIR, pdf_file)
+    # main() already runs one PDF per core, so pages are processed serially
+    extracted = process_pdf(input_path, page_workers=1)
+
+    output = {
+        "company": name,
+        "year": year,
+        "source": "Sustainability Report",
+        **extracted
+    }
+
+    # OUTPUT_DIR is created once by main()
+    output_path = f"{OUTPUT_DIR}/{safe_filename(name, year)}"
+    with open(output_path, "wb") as f:
+        f.write(orjson.dumps(output, option=JSON_DUMP_OPTIONS))
+
+    claims = output.get("claims", [])
+    page_metrics = output.get("page_metrics", [])
+    return {
+        "claims": len(claims),
+        "claims_with_good_context": sum(
+            1 for claim in claims
+            if claim.get("context") and len(claim.get("context", "")) > 100
+        ),
+        "scope1": sum(len(page["scope1_emissions_tco2e"]["value"]) for page in page_metrics),
+        "scope2": sum(len(page["scope2_emissions_tco2e"]["value"]) for page in page_metrics),
+        "scope3": sum(len(page["scope3_emissions_tco2e"]["value"]) for page in page_metrics)
+    }
+
 def main():
-    """Standalone execution for testing."""
+    """Standalone execution for testing, one PDF per CPU core."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     successful = 0
     failed = 0
@@ -814,45 +1157,27 @@ def main():
     
     print(f"\n=== PDF Processor with {len(CLAIM_KEYWORDS)} ESG Keywords ===\n", flush=True)
     
-    for pdf_file in sorted(os.listdir(INPUT_DIR)):
-        if not pdf_file.lower().endswith(".pdf"):
-            continue
-
-        try:
-            name, year = pdf_file.replace(".pdf", "").rsplit("_", 1)
-            year = int(year)
-            input_path = os.path.join(INPUT_DIR, pdf_file)
-            extracted = process_pdf(input_path)
-
-            output = {
-                "company": name,
-                "year": year,
-                "source": "Sustainability Report",
-                **extracted
-            }
-
-            claims_count = len(output.get("claims", []))
-            total_claims += claims_count
-            
-            for claim in output.get("claims", []):
-                if claim.get("context") and len(claim.get("context", "")) > 100:
-                    claims_with_good_context += 1
-            
-            for page in output.get("page_metrics", []):
-                total_scope1 += len(page.get("scope1_emissions_tco2e", []))
-                total_scope2 += len(page.get("scope2_emissions_tco2e", []))
-                total_scope3 += len(page.get("scope3_emissions_tco2e", []))
+    pdf_files = [f for f in sorted(os.listdir(INPUT_DIR)) if f.lower().endswith(".pdf")]
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [executor.submit(_process_one, pdf_file) for pdf_file in pdf_files]
+        
+        for pdf_file, future in zip(pdf_files, futures):
+            try:
+                summary = future.result()
+            except Exception as e:
+                print(f"✗ Failed: {pdf_file}: {type(e).__name__}: {e}", flush=True)
+                failed += 1
+                continue
 
-            output_path = os.path.join(OUTPUT_DIR, safe_filename(name, year))
-            with open(output_path, "w") as f:
-                json.dump(output, f, indent=2)
+            total_claims += summary["claims"]
+            claims_with_good_context += summary["claims_with_good_context"]
+            total_scope1 += summary["scope1"]
+            total_scope2 += summary["scope2"]
+            total_scope3 += summary["scope3"]
 
-            print(f"✓ {pdf_file} → {claims_count} claims, S1:{total_scope1}, S2:{total_scope2}, S3:{total_scope3}", flush=True)
+            print(f"✓ {pdf_file} → {summary['claims']} claims, S1:{total_scope1}, S2:{total_scope2}, S3:{total_scope3}", flush=True)
             successful += 1
-            
-        except Exception as e:
-            print(f"✗ Failed: {pdf_file}: {type(e).__name__}: {e}", flush=True)
-            failed += 1
     
     print(f"\n=== Processing Complete ===", flush=True)
     print(f"Successful: {successful}", flush=True)
@@ -1,16 +1,60 @@
 import sys
 import os
-import json
+import orjson
 import time
 import re
-import traceback
+import logging
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 sys.path.append('/app')
 
-from shared.tasks import dequeue_task, enqueue_task
+from shared.tasks import dequeue_task, enqueue_task, peek_task
 from shared.database import get_supabase_client
-from processor import process_pdf
+from processor import process_pdf, JSON_DUMP_OPTIONS
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(processName)s %(levelname)s %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Created once by main() at startup
+OUTPUT_DIR = "/data/intermediate_json"
+
+# Number of independent dequeue loops (one process each)
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "1"))
+
+# Write page records to an NDJSON sidecar while parsing instead of holding them
+# in memory; meant for very long reports
+STREAM_PAGE_METRICS = os.getenv("STREAM_PAGE_METRICS") == "1"
+
+# Filename and company-name patterns, compiled once
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+# Byte table doing the same as _NON_ALNUM_RE for ASCII: keep a-z, 0-9 and
+# whitespace, map everything else to a space
+_ASCII_KEEP = set(b'abcdefghijklmnopqrstuvwxyz0123456789') | {c for c in range(128) if chr(c).isspace()}
+_NON_ALNUM_TABLE = bytes(c if c in _ASCII_KEEP else 0x20 for c in range(256))
+_PDF_EXT_RE = re.compile(r'\.pdf$', re.IGNORECASE)
+_FILENAME_JUNK_RE = re.compile(r'[^a-zA-Z0-9\s_-]')
+_SEPARATORS_RE = re.compile(r'[_\-]+')
+_YEAR_START_RE = re.compile(r'^(19\d{2}|20\d{2})\s+(.+)$')
+_YEAR_END_RE = re.compile(r'^(.+?)\s+(19\d{2}|20\d{2})$')
+_YEAR_ANY_RE = re.compile(r'\b(19\d{2}|20\d{2})\b')
+_NOISE_RE = re.compile(
+    r'\b(sustainability|report|esg|annual|csr|corporate|responsibility)\b',
+    re.IGNORECASE
+)
+_DIGIT_WORD_RE = re.compile(r'\b\d+\b')
+
+
+def _remove_year_word(text: str, year) -> str:
+    """Remove whole-word occurrences of year without building a per-year pattern."""
+    year = str(year)
+    return _DIGIT_WORD_RE.sub(lambda m: '' if m.group() == year else m.group(), text)
+
 
 def normalize_company_name(name: str) -> str:
     """
@@ -19,10 +63,18 @@ def normalize_company_name(name: str) -> str:
     """
     if not name or not isinstance(name, str):
         return "Unknown"
-    
+    return _normalize_company_str(name)
+
+
+# Names recur across tasks and retries; results are pure functions of the input
+@lru_cache(maxsize=4096)
+def _normalize_company_str(name: str) -> str:
     # Standardize casing and whitespace
-    normalized = name.lower().strip()
-    normalized = re.sub(r'[^a-z0-9\s]', ' ', normalized)
+    normalized = name.lower()
+    if normalized.isascii():
+        normalized = normalized.encode('ascii').translate(_NON_ALNUM_TABLE).decode('ascii')
+    else:
+        normalized = _NON_ALNUM_RE.sub(' ', normalized)
     normalized = ' '.join(normalized.split())
     
     # Final fallback: title case with cleanup
@@ -33,51 +85,51 @@ def extract_company_year_from_filename(filename: str):
     if not filename:
         return "Unknown", datetime.utcnow().year
 
-    name = re.sub(r'\.pdf$', '', filename, flags=re.IGNORECASE)
-    name = re.sub(r'[^a-zA-Z0-9\s_-]', ' ', name)
-    name = re.sub(r'[_\-]+', ' ', name)
+    company, year = _parse_filename(filename)
+    # The current-year default stays outside the cache so it never goes stale
+    return company, year or datetime.utcnow().year
+
+
+@lru_cache(maxsize=4096)
+def _parse_filename(filename: str):
+    """Company and year (None if absent) parsed from a report filename."""
+    name = _PDF_EXT_RE.sub('', filename)
+    name = _FILENAME_JUNK_RE.sub(' ', name)
+    name = _SEPARATORS_RE.sub(' ', name)
 
     name = ' '.join(name.split())
 
     year = None
 
     # Priority 1: Year at START
-    m = re.match(r'^(19\d{2}|20\d{2})\s+(.+)$', name)
+    m = _YEAR_START_RE.match(name)
     if m:
         year = int(m.group(1))
         name = m.group(2)
 
     # Priority 2: Year at END
     if not year:
-        m = re.match(r'^(.+?)\s+(19\d{2}|20\d{2})$', name)
+        m = _YEAR_END_RE.match(name)
         if m:
             name = m.group(1)
             year = int(m.group(2))
 
     # Priority 3: Year anywhere
     if not year:
-        m = re.search(r'\b(19\d{2}|20\d{2})\b', name)
+        m = _YEAR_ANY_RE.search(name)
         if m:
             year = int(m.group(1))
-            name = re.sub(rf'\b{year}\b', '', name)
+            name = _remove_year_word(name, year)
         
 
     # Remove report noise
-    company = re.sub(
-        r'\b(sustainability|report|esg|annual|csr|corporate|responsibility)\b',
-        '',
-        name,
-        flags=re.IGNORECASE
-    )
+    company = _NOISE_RE.sub('', name)
 
     company = ' '.join(company.split())
 
     if not company:
         company = "Unknown"
 
-    if not year:
-        year = datetime.utcnow().year
-
     company = normalize_company_name(company)
 
     return company, year
@@ -103,58 +155,67 @@ def process_task(task):
     file_path = task['path']
     original_filename = task.get('filename', f'{doc_id}.pdf')
     
-    print(f" PROCESSING PDF TASK: {doc_id}")
-    print(f" Original filename: {original_filename}")
-    print(f" File path: {file_path}")
-    print(f" Uploaded at: {task.get('uploaded_at', 'N/A')}")
+    logger.info("Processing PDF task %s (%s)", doc_id, original_filename)
+    logger.debug("File path: %s | uploaded at: %s", file_path, task.get('uploaded_at', 'N/A'))
     
-    # Verify file exists
-    if not os.path.exists(file_path):
+    # Verify file exists (a single stat also gives the size)
+    try:
+        file_size = os.stat(file_path).st_size
+    except FileNotFoundError:
         error_msg = f"File not found: {file_path}"
-        print(error_msg)
+        logger.error(error_msg)
         _log_error_to_supabase(doc_id, "file_not_found", error_msg)
         return False
     
-    file_size = os.path.getsize(file_path)
-    print(f"File exists ({file_size:,} bytes)")
+    logger.debug("File exists (%d bytes)", file_size)
     
     # API-provided metadata (most reliable)
     company = task.get('company')
     year = task.get('year')
     metadata_source = task.get('metadata_source', 'unknown')
+    inferred_company = None
     
     if company and year:
-        print(f" Using API-provided metadata:")
-        print(f"   Company: '{company}' | Year: {year}")
+        logger.debug("Using API-provided metadata: company=%r year=%s", company, year)
         metadata_source = "api_provided"
     
     #Filename parsing (fallback)
     else:
-        print(f" No API metadata provided - parsing filename...")
         inferred_company, inferred_year = extract_company_year_from_filename(original_filename)
         company = company or inferred_company or "Unknown"
         year = year or inferred_year or datetime.utcnow().year
         metadata_source = "filename_parsed"
-        print(f"   Inferred company: '{inferred_company}' | year: {inferred_year}")
+        logger.debug("No API metadata provided, parsed filename: company=%r year=%s",
+                     inferred_company, inferred_year)
     
-    # Normalize company name to canonical form
-    normalized_company = normalize_company_name(company)
+    # Normalize company name to canonical form (a filename-inferred name already is)
+    if company == inferred_company:
+        normalized_company = company
+    else:
+        normalized_company = normalize_company_name(company)
     normalized_year = int(year)
     
-    print(f"   Raw company: '{company}' → Normalized: '{normalized_company}'")
-    print(f"   Raw year: {year} → Normalized: {normalized_year}")
+    logger.debug("Normalized company %r -> %r, year %s -> %s",
+                 company, normalized_company, year, normalized_year)
     
     # Prevent year-in-company-name issues
     if str(normalized_year) in normalized_company:
-        clean_company = re.sub(r'\b' + str(normalized_year) + r'\b', '', normalized_company)
+        clean_company = _remove_year_word(normalized_company, normalized_year)
         clean_company = ' '.join(clean_company.strip().split())
         if clean_company and clean_company != normalized_company:
-            print(f"Removed year from company name: '{normalized_company}' → '{clean_company}'")
+            logger.debug("Removed year from company name: %r -> %r", normalized_company, clean_company)
             normalized_company = clean_company
     
+    # Generate safe filename using NORMALIZED values
+    safe_company = normalized_company.replace(' ', '_').replace('/', '_')
+    output_path = f"{OUTPUT_DIR}/{safe_company}_{normalized_year}.json"
+    
     try:
         # Run PDF processor
-        result = process_pdf(file_path)
+        if STREAM_PAGE_METRICS:
+            result = process_pdf(file_path, page_metrics_path=output_path[:-len(".json")] + ".pages.ndjson")
+        else:
+            result = process_pdf(file_path)
         
         # Override processor's metadata with normalized values
         result['company'] = normalized_company
@@ -167,43 +228,28 @@ def process_task(task):
         result['processed_at'] = datetime.utcnow().isoformat()
         result['file_size_bytes'] = file_size
         
-        print(f" PDF processed successfully!")
-        print(f"   Company: {normalized_company}")
-        print(f"   Year: {normalized_year}")
-        print(f"   Claims extracted: {len(result.get('claims', []))}")
-        print(f"   Pages processed: {len(result.get('pages', []))}")
+        logger.debug("PDF processed: %s %s, %d claims",
+                     normalized_company, normalized_year, len(result.get('claims', [])))
         
     except Exception as e:
         error_msg = f"PDF processing failed: {str(e)}"
-        print(f"\n{error_msg}")
-        traceback.print_exc()
+        logger.exception(error_msg)
         _log_error_to_supabase(doc_id, "pdf_processing_error", error_msg)
         return False
     
     try:
-        output_dir = "/data/intermediate_json"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Generate safe filename using NORMALIZED values
-        safe_company = normalized_company.replace(' ', '_').replace('/', '_')
-        output_filename = f"{safe_company}_{normalized_year}.json"
-        output_path = os.path.join(output_dir, output_filename)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(result, option=JSON_DUMP_OPTIONS))
         
-        print(f" Saved to: {output_path}")
+        logger.debug("Saved to: %s", output_path)
         
     except Exception as e:
         error_msg = f"Failed to save intermediate JSON: {str(e)}"
-        print(f"{error_msg}")
-        traceback.print_exc()
+        logger.exception(error_msg)
         _log_error_to_supabase(doc_id, "save_error", error_msg)
         return False
     
     # Enqueue for next stage (AI Audit) with normalized metadata
-    print(f" ENQUEUING FOR AI AUDIT")
-    
     try:
         audit_task = {
             "id": doc_id,
@@ -219,23 +265,16 @@ def process_task(task):
         }
         
         enqueue_task("ai_audit", audit_task)
-        print(f"Enqueued to 'ai_audit' queue")
-        print(f"Company: '{normalized_company}' | Year: {normalized_year}")
         
     except Exception as e:
         error_msg = f"Failed to enqueue audit task: {str(e)}"
-        print(f"{error_msg}")
-        traceback.print_exc()
+        logger.exception(error_msg)
         _log_error_to_supabase(doc_id, "enqueue_error", error_msg)
         return False
     
     # Success summary
-    print(f" TASK COMPLETED SUCCESSFULLY")
-    print(f" Document ID: {doc_id}")
-    print(f" Company: {normalized_company}")
-    print(f" Year: {normalized_year}")
-    print(f" Claims: {len(result.get('claims', []))}")
-    print(f" Output: {output_path}")
+    logger.info("Task %s completed: %s %s, %d claims -> %s", doc_id, normalized_company,
+                normalized_year, len(result.get('claims', [])), output_path)
     
     return True
 
@@ -252,39 +291,94 @@ def _log_error_to_supabase(doc_id: str, error_type: str, message: str):
             'timestamp': datetime.utcnow().isoformat()
         }).execute()
     except Exception as e:
-        print(f"  Failed to log error to Supabase: {e}")
+        logger.warning("Failed to log error to Supabase: %s", e)
+
+
+def _warm_file(path: str):
+    """Start reading path into the page cache ahead of parsing."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # process_task reports missing files
+    try:
+        if hasattr(os, "posix_fadvise"):
+            # Kernel readahead runs asynchronously, without copying into Python
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        else:
+            while os.read(fd, 1 << 20):
+                pass
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _warm_next_task():
+    """Prefetch the PDF of the task at the head of the queue, leaving it queued."""
+    try:
+        task = peek_task("pdf_processing")
+    except Exception:
+        return  # Only an optimization; the main loop reports Redis errors
+    if task and task.get('path'):
+        _warm_file(task['path'])
 
 
 def main():
     """Worker main loop with health checks."""
-    print(" PDF PROCESSOR WORKER")
+    logger.info("PDF processor worker starting")
     
     # Create required directories
     os.makedirs("/data/raw_pdfs", exist_ok=True)
-    os.makedirs("/data/intermediate_json", exist_ok=True)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    print("\n Waiting for tasks on 'pdf_processing' queue...\n")
+    logger.info("Waiting for tasks on 'pdf_processing' queue")
     
-    while True:
-        try:
-            # Block until task available (5 second timeout for graceful shutdown)
-            task = dequeue_task("pdf_processing", timeout=5)
-            
-            if task:
-                print(f"\n New task received: {task.get('id', 'unknown')}")
-                success = process_task(task)
+    # While the current PDF is parsed, the next queued task's file is read
+    # into the page cache in the background. The task itself is only peeked
+    # at, so it stays in the queue for any idle worker and is never lost if
+    # this one is killed mid-parse
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        while True:
+            try:
+                # Block until task available (5 second timeout for graceful shutdown)
+                task = dequeue_task("pdf_processing", timeout=5)
                 
-                if not success:
-                    print(f" TASK FAILED - See logs above for details")
-                
-        except KeyboardInterrupt:
-            print("\n\n Shutting down worker gracefully...")
-            break
-        except Exception as e:
-            print(f"\n  UNEXPECTED WORKER ERROR: {e}")
-            traceback.print_exc()
-            time.sleep(5)  # Prevent tight error loops
+                if task:
+                    prefetcher.submit(_warm_next_task)
+                    success = process_task(task)
+                    
+                    if not success:
+                        logger.warning("Task %s failed", task.get('id', 'unknown'))
+                    
+            except KeyboardInterrupt:
+                logger.info("Shutting down worker gracefully")
+                break
+            except Exception as e:
+                logger.exception("Unexpected worker error: %s", e)
+                time.sleep(5)  # Prevent tight error loops
+
+
+def run_workers(concurrency):
+    """Run one worker loop per process so queue tasks are processed concurrently."""
+    if concurrency <= 1:
+        main()
+        return
+    
+    processes = [
+        multiprocessing.Process(target=main, name=f"pdf-worker-{i}")
+        for i in range(concurrency)
+    ]
+    for process in processes:
+        process.start()
+    
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Children receive the same SIGINT and leave their loops
+        for process in processes:
+            process.join()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_workers(WORKER_CONCURRENCY)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from playwright.sync_api import sync_playwright
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 import os
 import re
@@ -6,6 +7,10 @@ from urllib.parse import urljoin
 
 OUTPUT_DIR = "/data/raw_pdfs"
 
+# Direct PDF downloads are plain network I/O and run on a small thread pool,
+# overlapping each other and the (single-threaded) Playwright page scraping
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "4"))
+
 PDFS = [
     {
         "company": "SGX Group",
@@ -39,24 +44,42 @@ def safe_filename(company, year):
     return f"{company.replace(' ', '_')}_{year}.pdf"
 
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
 def download_direct_pdf(url, path):
-    r = requests.get(
+    # Streamed so the content type is checked before the body is fetched and
+    # the report is written in chunks instead of being held in memory whole.
+    # Chunks go to a temporary file that only replaces path once complete, so
+    # an interrupted download never leaves a truncated PDF behind
+    with requests.get(
         url,
+        stream=True,
         timeout=30,
         allow_redirects=True,
         headers={
             "User-Agent": "Mozilla/5.0",
             "Accept": "application/pdf"
         }
-    )
-    r.raise_for_status()
-
-    content_type = r.headers.get("Content-Type", "")
-    if "pdf" not in content_type.lower():
-        raise ValueError("URL did not resolve to a PDF")
-
-    with open(path, "wb") as f:
-        f.write(r.content)
+    ) as r:
+        r.raise_for_status()
+
+        content_type = r.headers.get("Content-Type", "")
+        if "pdf" not in content_type.lower():
+            raise ValueError("URL did not resolve to a PDF")
+
+        part_path = path + ".part"
+        try:
+            with open(part_path, "wb") as f:
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(part_path, path)
+        except BaseException:
+            try:
+                os.unlink(part_path)
+            except OSError:
+                pass
+            raise
 
 
 
@@ -78,6 +101,40 @@ def is_pdf_url(url: str) -> bool:
 def run():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+    downloads = {}  # future -> (company, path)
+
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+        # Case 1: Direct PDF, queued before the browser starts
+        page_sources = []
+        for pdf in PDFS:
+            filename = safe_filename(pdf["company"], pdf["year"])
+            path = os.path.join(OUTPUT_DIR, filename)
+
+            if pdf["url"].lower().endswith(".pdf"):
+                print(f"Processing {pdf['company']}...")
+                future = pool.submit(download_direct_pdf, pdf["url"], path)
+                downloads[future] = (pdf["company"], path)
+            else:
+                page_sources.append((pdf, path))
+
+        try:
+            if page_sources:
+                scrape_pages(page_sources, pool, downloads)
+        except Exception as e:
+            # e.g. Chromium failed to launch; downloads already queued still run
+            print(f"Page scraping failed: {e}")
+
+        for future in as_completed(downloads):
+            company, path = downloads[future]
+            try:
+                future.result()
+                print(f"Downloaded {path}")
+            except Exception as e:
+                print(f"Failed for {company}: {e}")
+
+
+def scrape_pages(page_sources, pool, downloads):
+    """Find report links with Playwright, handing PDF downloads to the pool."""
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(
@@ -89,19 +146,10 @@ def run():
         )
         page = context.new_page()
 
-        for pdf in PDFS:
-            filename = safe_filename(pdf["company"], pdf["year"])
-            path = os.path.join(OUTPUT_DIR, filename)
-
+        for pdf, path in page_sources:
             try:
                 print(f"Processing {pdf['company']}...")
 
-                # Case 1: Direct PDF
-                if pdf["url"].lower().endswith(".pdf"):
-                    download_direct_pdf(pdf["url"], path)
-                    print(f"Downloaded {path}")
-                    continue
-
                 # Case 2: Page → Playwright
                 page.goto(pdf["url"], wait_until="networkidle", timeout=60000)
 
@@ -111,10 +159,11 @@ def run():
                     continue
 
                 if is_pdf_url(pdf_link):
-                    download_direct_pdf(pdf_link, path)
-                else:
-                    page.goto(pdf_link, wait_until="networkidle")
+                    future = pool.submit(download_direct_pdf, pdf_link, path)
+                    downloads[future] = (pdf["company"], path)
+                    continue
 
+                page.goto(pdf_link, wait_until="networkidle")
                 print(f"Downloaded {path}")
 
             except Exception as e:
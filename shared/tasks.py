@@ -1,16 +1,27 @@
 import redis
-import json
+import orjson
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Get Redis connection details from environment
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "32"))
+# Seconds a caller waits for a free pooled connection before erroring
+REDIS_POOL_TIMEOUT = int(os.getenv("REDIS_POOL_TIMEOUT", "20"))
 
 # Parse Redis URL and create client with explicit parameters
 try:
     from urllib.parse import urlparse
     parsed = urlparse(REDIS_URL)
     
-    redis_client = redis.Redis(
+    # Explicit, bounded pool shared by every caller in the process (including
+    # the PDF worker's prefetch thread and the API's request threads). When
+    # all connections are busy, callers wait for one instead of failing
+    pool = redis.BlockingConnectionPool(
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
         host=parsed.hostname or 'redis',
         port=parsed.port or 6379,
         db=0,
@@ -20,6 +31,7 @@ try:
         retry_on_timeout=True,
         health_check_interval=30
     )
+    redis_client = redis.Redis(connection_pool=pool)
     
     # Test connection on import
     redis_client.ping()
@@ -36,15 +48,30 @@ except Exception as e:
 
 def enqueue_task(queue_name: str, task_data: dict):
     """Add task to queue."""
-    redis_client.rpush(queue_name, json.dumps(task_data))
-    print(f"✓ Enqueued task to {queue_name}: {task_data.get('id', 'unknown')}", flush=True)
+    redis_client.rpush(queue_name, orjson.dumps(task_data))
+    logger.debug("Enqueued task to %s: %s", queue_name, task_data.get('id', 'unknown'))
+
+def enqueue_tasks(queue_name: str, tasks: list):
+    """Add several tasks to queue in a single round trip."""
+    if not tasks:
+        return
+    # RPUSH is variadic, so the whole batch lands in order with one command
+    redis_client.rpush(queue_name, *(orjson.dumps(task_data) for task_data in tasks))
+    logger.debug("Enqueued %d tasks to %s", len(tasks), queue_name)
 
 def dequeue_task(queue_name: str, timeout: int = 0):
     """Get task from queue (blocking)."""
     result = redis_client.blpop(queue_name, timeout=timeout)
     if result:
         _, task_json = result
-        return json.loads(task_json)
+        return orjson.loads(task_json)
+    return None
+
+def peek_task(queue_name: str):
+    """Return the task at the head of the queue without removing it."""
+    task_json = redis_client.lindex(queue_name, 0)
+    if task_json:
+        return orjson.loads(task_json)
     return None
 
 def get_queue_length(queue_name: str) -> int: